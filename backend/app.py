@@ -203,15 +203,15 @@ def execute_plan_task(job_id: str):
             mapper = PlanMapper(ontology)
             
             # Mapiraj plan na ontologiju
-            task_uri = mapper.map_plan_to_ontology(plan_dict)
+            task_uri, _ = mapper.map_plan_to_ontology(plan_dict)
             
             # Azuriraj stanja koraka
             steps = mapper.get_steps_from_ontology(task_uri)
-            for i, step in enumerate(steps):
-                if i < len(results.get("steps", [])):
-                    step_result = results["steps"][i]
-                    state = "completed" if step_result.get("success") else "failed"
-                    mapper.update_step_state(step["uri"], state)
+            step_results = results.get("steps", [])
+            mapper.update_step_states([
+                (step.uri, "completed" if step_result.get("success") else "failed")
+                for step, step_result in zip(steps, step_results)
+            ])
             
             # Sacuvaj ontologiju
             ontology_path = os.path.join(ONTOLOGY_DIR, f"execution_{job_id}.owl")
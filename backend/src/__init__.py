@@ -1 +1,10 @@
-from .screen_recorder import ScreenRecorder
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # ScreenRecorder povlaci pyautogui, pa se ucitava tek kada zatreba
+    if name == 'ScreenRecorder':
+        value = importlib.import_module('.screen_recorder', __name__).ScreenRecorder
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,11 +1,15 @@
-from groq import Groq
 import json
 import os
+import re
 from dotenv import load_dotenv
 from . models import ParsedInput
+from .llm_client import get_groq_client
 
 load_dotenv()
 
+# JSON objekat unutar markdown bloka (```json ... ``` ili ``` ... ```)
+_FENCE_RE = re.compile(r"```(?:json)?\s*(\{.*\})\s*```", re.DOTALL)
+
 class InputProcessor:
     """Groq parsira tekstualni opis korisnika"""
     
@@ -14,7 +18,7 @@ class InputProcessor:
         if not api_key: 
             raise ValueError("GROQ_API_KEY is not set in the .env file!")
         
-        self.client = Groq(api_key=api_key)
+        self.client = get_groq_client(api_key)
         self.model = "llama-3.3-70b-versatile"
         print(f"Groq initialized (model: {self.model})")
     
@@ -51,12 +55,9 @@ class InputProcessor:
         response_text = response. choices[0].message.content. strip()
         
         # Ocisti ako ima markdown formatiranje
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
-        
-        response_text = response_text. strip()
+        match = _FENCE_RE.search(response_text)
+        if match:
+            response_text = match.group(1)
         
         try:
             parsed_data = json. loads(response_text)
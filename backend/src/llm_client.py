@@ -0,0 +1,30 @@
+import threading
+from groq import Groq
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def _warm_up(client: Groq):
+    """Otvori HTTPS konekciju u pozadini, da prvi pravi poziv ne ceka TCP+TLS"""
+    try:
+        client.models.list()
+    except Exception as e:
+        print(f"[LLMClient] Warm-up failed: {e}")
+
+
+def get_groq_client(api_key: str) -> Groq:
+    """
+    Zajednicki Groq klijent za cijeli proces.
+
+    Svi InputProcessor i TaskDecomposer objekti dijele isti connection pool.
+    Pri prvom pozivu se konekcija otvara u pozadinskom threadu.
+    """
+    global _client
+
+    with _client_lock:
+        if _client is None:
+            _client = Groq(api_key=api_key)
+            threading.Thread(target=_warm_up, args=(_client,), daemon=True).start()
+
+    return _client
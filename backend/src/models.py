@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from dataclasses import dataclass
 from enum import Enum
 from typing import Optional, List
 
@@ -17,6 +18,9 @@ class ActionType(str, Enum):
     MOVE_MOUSE = "move_mouse"
 
 class Step(BaseModel):
+    # Nepromjenljiv - plan se ne mijenja nakon kreiranja
+    model_config = ConfigDict(frozen=True)
+    
     id: int
     action: ActionType
     target: str
@@ -38,4 +42,16 @@ class ParsedInput(BaseModel):
     intent: str
     application:  str
     programming_language: Optional[str] = None
-    specific_actions: List[str]
\ No newline at end of file
+    specific_actions: List[str]
+
+
+@dataclass(slots=True)
+class NormalizedStep:
+    """Normalizovan korak koji koriste ontologija i OntologyExecutor"""
+    id: int
+    action: str
+    target: str
+    value: Optional[str]
+    description: str
+    expected_result: str
+    uri: str = ""
\ No newline at end of file
@@ -1,6 +1,22 @@
-from .ontology_manager import OntologyManager
-from .plan_mapper import PlanMapper
-from .plan_validator import PlanValidator
-from .ontology_executor import OntologyExecutor
+import importlib
 
-__all__ = ['OntologyManager', 'PlanMapper', 'PlanValidator', 'OntologyExecutor']
\ No newline at end of file
+# Klase se ucitavaju tek kada zatrebaju (PEP 562), da npr. PlanValidator
+# ne povuce Vision AI i snimanje ekrana
+_EXPORTS = {
+    'OntologyManager': '.ontology_manager',
+    'PlanMapper': '.plan_mapper',
+    'PlanValidator': '.plan_validator',
+    'OntologyExecutor': '.ontology_executor',
+}
+
+__all__ = ['OntologyManager', 'PlanMapper', 'PlanValidator', 'OntologyExecutor']
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
\ No newline at end of file
@@ -0,0 +1,119 @@
+import os
+import re
+
+# Tipovi UI elemenata za Vision AI kontekst
+MENU = 0
+SEARCH = 1
+ADDRESS = 2
+BUTTON = 3
+GENERIC = 4
+
+_MENU_WORDS = frozenset({"file", "edit", "view", "tools", "help"})
+_BUTTON_RE = re.compile(r'\b(button|next|ok|cancel|create)\b')
+
+
+def _classify_py(target: str) -> int:
+    """Klasifikuj target (cisti Python)"""
+    t = target.lower()
+
+    if t in _MENU_WORDS:
+        return MENU
+    elif "search" in t:
+        return SEARCH
+    elif "address" in t or "url" in t:
+        return ADDRESS
+    elif _BUTTON_RE.search(t):
+        return BUTTON
+    return GENERIC
+
+
+classify_target = _classify_py
+
+# Numba je opciona - ukljucuje se sa ONTOLOGY_USE_NUMBA=1
+if os.getenv("ONTOLOGY_USE_NUMBA") == "1":
+    try:
+        import numpy as np
+        from numba import njit
+    except ImportError:
+        print("[TargetClassifier] Numba not installed, using pure Python")
+    else:
+        def _word(text: str):
+            return np.frombuffer(text.encode("ascii"), dtype=np.uint8)
+
+        _W_FILE, _W_EDIT, _W_VIEW, _W_TOOLS, _W_HELP = (
+            _word(w) for w in ("file", "edit", "view", "tools", "help")
+        )
+        _W_SEARCH, _W_ADDRESS, _W_URL = (_word(w) for w in ("search", "address", "url"))
+        _W_BUTTON, _W_NEXT, _W_OK, _W_CANCEL, _W_CREATE = (
+            _word(w) for w in ("button", "next", "ok", "cancel", "create")
+        )
+
+        @njit(cache=True)
+        def _equals_at(data, start, end, word):
+            """Da li je data[start:end] jednako word"""
+            if end - start != word.shape[0]:
+                return False
+            for i in range(word.shape[0]):
+                if data[start + i] != word[i]:
+                    return False
+            return True
+
+        @njit(cache=True)
+        def _contains(data, word):
+            """Da li data sadrzi word kao podniz"""
+            n = data.shape[0]
+            m = word.shape[0]
+            for start in range(n - m + 1):
+                if _equals_at(data, start, start + m, word):
+                    return True
+            return False
+
+        @njit(cache=True)
+        def _is_word_byte(b):
+            """Slovo, cifra ili _, kao \\w (ne-ASCII znakovi koji nisu slova ili cifre su vec zamijenjeni razmakom)"""
+            return ((b >= 97 and b <= 122) or (b >= 48 and b <= 57)
+                    or b == 95 or b >= 128)
+
+        @njit(cache=True)
+        def _is_button_word(data, start, end):
+            return (_equals_at(data, start, end, _W_BUTTON)
+                    or _equals_at(data, start, end, _W_NEXT)
+                    or _equals_at(data, start, end, _W_OK)
+                    or _equals_at(data, start, end, _W_CANCEL)
+                    or _equals_at(data, start, end, _W_CREATE))
+
+        @njit(cache=True)
+        def _classify_bytes(data):
+            n = data.shape[0]
+
+            if (_equals_at(data, 0, n, _W_FILE) or _equals_at(data, 0, n, _W_EDIT)
+                    or _equals_at(data, 0, n, _W_VIEW) or _equals_at(data, 0, n, _W_TOOLS)
+                    or _equals_at(data, 0, n, _W_HELP)):
+                return MENU
+            if _contains(data, _W_SEARCH):
+                return SEARCH
+            if _contains(data, _W_ADDRESS) or _contains(data, _W_URL):
+                return ADDRESS
+
+            # Cijele rijeci, kao \b...\b u regexu
+            start = 0
+            while start < n:
+                while start < n and not _is_word_byte(data[start]):
+                    start += 1
+                end = start
+                while end < n and _is_word_byte(data[end]):
+                    end += 1
+                if end > start and _is_button_word(data, start, end):
+                    return BUTTON
+                start = end
+            return GENERIC
+
+        def classify_target(target: str) -> int:
+            """Klasifikuj target (Numba)"""
+            t = target.lower()
+            if not t.isascii():
+                # Ne-ASCII interpunkcija (crtica, razmak bez prekida...) je granica
+                # rijeci za \b - zamijeni je razmakom, da rezultat bude isti kao _classify_py
+                t = "".join(c if c.isascii() or c.isalnum() else " " for c in t)
+            data = np.frombuffer(t.encode("utf-8"), dtype=np.uint8)
+            return _classify_bytes(data)
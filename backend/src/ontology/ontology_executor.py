@@ -1,22 +1,59 @@
+import logging
+import logging.handlers
+import sys
 import time
-from typing import Dict, Any, List, Optional
-from rdflib import URIRef
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from .ontology_manager import OntologyManager
 from .plan_mapper import PlanMapper
 from .plan_validator import PlanValidator
-from ..execution.screen_analyzer import ScreenAnalyzer
-from ..execution.action_performer import ActionPerformer
-from ..screen_recorder import ScreenRecorder
+from ..models import NormalizedStep
+from ._target_classify_numba import classify_target, MENU, SEARCH, ADDRESS, BUTTON
+
+log = logging.getLogger("ontology_executor")
+
+# Poruke se skupljaju i ispisuju u grupama (odmah za greske)
+_log_buffer = logging.handlers.MemoryHandler(
+    capacity=100,
+    flushLevel=logging.ERROR,
+    target=logging.StreamHandler(sys.stdout)
+)
+if not log.handlers:
+    _log_buffer.target.setFormatter(logging.Formatter("%(message)s"))
+    log.addHandler(_log_buffer)
+    log.setLevel(logging.INFO)
 
 
 class OntologyExecutor:
     """Izvrsava korake na osnovu ontologije."""
     
+    # Broj koraka nakon kojeg se stanja upisuju u ontologiju
+    STATE_FLUSH_INTERVAL = 16
+    
+    # Koliko dugo (u sekundama) vaze kesirane koordinate elemenata.
+    # Kes se brise nakon svakog klika i akcija koje mijenjaju ekran, pa pomaze
+    # samo kada se isti element trazi vise puta bez promjene ekrana
+    ELEMENT_CACHE_TTL = 30.0
+    
+    # Pauza prije prvog koraka, kada snimanje nije potvrdjeno
+    START_DELAY = 3.0
+    
+    # Kratka pauza na pocetku videa kada je snimanje potvrdjeno
+    RECORDING_LEAD_IN = 1.0
+    
+    # Tasteri nakon kojih se ekran vjerovatno mijenja
+    SCREEN_CHANGING_KEYS = frozenset({"enter", "return", "tab", "escape", "esc", "f5"})
+    
     def __init__(self, slow_mode: bool = True, record_video: bool = True):
         self.ontology = OntologyManager()
         self.mapper = PlanMapper(self.ontology)
         self.validator = PlanValidator(self.ontology)
         
+        # Teski moduli (pyautogui, Vision AI, FFmpeg) se ucitavaju tek ovdje
+        from ..execution.screen_analyzer import ScreenAnalyzer
+        from ..execution.action_performer import ActionPerformer
+        from ..screen_recorder import ScreenRecorder
+        
         self.analyzer = ScreenAnalyzer()
         self.performer = ActionPerformer(slow_mode=slow_mode)
         self.recorder = ScreenRecorder() if record_video else None
@@ -24,7 +61,28 @@ class OntologyExecutor:
         self.slow_mode = slow_mode
         self.record_video = record_video
         
-        print("[OntologyExecutor] Initialized")
+        self._pending_state_updates: List[Tuple[str, str]] = []
+        
+        # Najraniji trenutak (time.monotonic) za sljedecu akciju
+        self._deadline = 0.0
+        
+        # Kes koordinata: (target, context) -> (vrijeme, element)
+        self._element_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+        
+        # Akcija -> metoda koja je izvrsava
+        self._dispatch: Dict[str, Callable[[NormalizedStep], bool]] = {
+            "open_application": self._do_open,
+            "wait": self._do_wait,
+            "click": self._do_click,
+            "double_click": self._do_double_click,
+            "right_click": self._do_right_click,
+            "type_text": self._do_type_text,
+            "key_press": self._do_key_press,
+            "key_combination": self._do_key_combination,
+            "scroll": self._do_scroll,
+        }
+        
+        log.info("[OntologyExecutor] Initialized")
     
     def execute_from_plan(self, plan_dict: Dict[str, Any], 
                           video_name: Optional[str] = None) -> Dict[str, Any]:
@@ -49,43 +107,56 @@ class OntologyExecutor:
         }
         
         # 1. Validiraj plan
-        print("\n[OntologyExecutor] Validating plan...")
+        log.info("\n[OntologyExecutor] Validating plan...")
         validation = self.validator.get_validation_report(plan_dict)
         results["validation"] = validation
         
         if not validation["is_valid"]:
-            print(f"[OntologyExecutor] Plan is not valid!")
+            log.error("[OntologyExecutor] Plan is not valid!")
             for error in validation["errors"]:
-                print(f"Error: {error}")
+                log.error("Error: %s", error)
             return results
         
         if validation["warnings"]:
-            print("[OntologyExecutor] Warnings:")
+            log.warning("[OntologyExecutor] Warnings:")
             for warning in validation["warnings"]:
-                print(f"{warning}")
-        
-        # 2. Mapiraj na ontologiju
-        print("\n[OntologyExecutor] Mapping plan to ontology...")
-        task_uri = self.mapper.map_plan_to_ontology(plan_dict)
+                log.warning("%s", warning)
         
-        # 3. Dobij korake iz ontologije
-        steps = self.mapper.get_steps_from_ontology(task_uri)
-        results["total_steps"] = len(steps)
+        # 2. Pokreni snimanje u pozadini, dok se plan mapira na ontologiju
+        task_id = PlanMapper.new_task_id()
         
-        print(f"[OntologyExecutor] Loaded {len(steps)} steps from ontology")
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            rec_future = None
+            if self.record_video and self.recorder:
+                log.info("\n[OntologyExecutor] Starting recording...")
+                if video_name is None:
+                    video_name = f"tutorial_{task_id}"
+                rec_future = pool.submit(self.recorder.start_recording, video_name)
+            
+            try:
+                # 3. Mapiraj na ontologiju
+                log.info("\n[OntologyExecutor] Mapping plan to ontology...")
+                task_uri, _ = self.mapper.map_plan_to_ontology(plan_dict, task_id)
+                
+                # 4. Dobij korake iz ontologije
+                steps = self.mapper.get_steps_from_ontology(task_uri)
+            except Exception:
+                if rec_future and rec_future.result():
+                    self.recorder.stop_recording()
+                raise
+            
+            video_path = rec_future.result() if rec_future else None
         
-        # 4. Pokreni snimanje
-        video_path = None
-        if self.record_video and self.recorder:
-            print("\n[OntologyExecutor] Starting recording...")
-            if video_name is None:
-                video_name = f"tutorial_{task_uri.split('_')[-1]}"
-            video_path = self.recorder.start_recording(video_name)
-            time.sleep(2)
+        results["total_steps"] = len(steps)
+        log.info("[OntologyExecutor] Loaded %d steps from ontology", len(steps))
         
         # 5. Izvrsi korake
-        print("\n[OntologyExecutor] Starting execution...")
-        time.sleep(3)
+        log.info("\n[OntologyExecutor] Starting execution...")
+        if video_path and self.recorder.wait_ready(timeout=2.0):
+            self._defer(self.RECORDING_LEAD_IN)
+        else:
+            self._defer(self.START_DELAY)
+        self._invalidate_element_cache()
         
         try:
             for step in steps:
@@ -94,7 +165,9 @@ class OntologyExecutor:
                 
                 # Azuriraj stanje u ontologiji
                 state = "completed" if step_result["success"] else "failed"
-                self.mapper.update_step_state(step["uri"], state)
+                self._pending_state_updates.append((step.uri, state))
+                if len(self._pending_state_updates) >= self.STATE_FLUSH_INTERVAL:
+                    self.flush_state_updates()
                 
                 if step_result["success"]:
                     results["successful_steps"] += 1
@@ -102,12 +175,15 @@ class OntologyExecutor:
                     results["failed_steps"] += 1
                     
         except Exception as e:
-            print(f"[OntologyExecutor] Critical error: {e}")
+            log.error("[OntologyExecutor] Critical error: %s", e)
             
         finally:
+            self.flush_state_updates()
+            
             # 6. Zaustavi snimanje
             if self.record_video and self.recorder and self.recorder.is_recording:
-                time.sleep(2)
+                self._defer(2)
+                self._gate()
                 final_video = self.recorder.stop_recording()
                 if final_video:
                     results["video_path"] = final_video
@@ -115,117 +191,193 @@ class OntologyExecutor:
         # 7. Rezultat
         results["success"] = results["failed_steps"] == 0
         
-        print("\n" + "=" * 60)
-        print("[OntologyExecutor] Result")
-        print("=" * 60)
-        print(f"   Successful: {results['successful_steps']}/{results['total_steps']}")
-        print(f"   Status: {'SUCCESS' if results['success'] else 'FAILURE'}")
+        lines = [
+            "\n" + "=" * 60,
+            "[OntologyExecutor] Result",
+            "=" * 60,
+            f"   Successful: {results['successful_steps']}/{results['total_steps']}",
+            f"   Status: {'SUCCESS' if results['success'] else 'FAILURE'}",
+        ]
         if results["video_path"]:
-            print(f"   Video: {results['video_path']}")
-        print("=" * 60)
+            lines.append(f"   Video: {results['video_path']}")
+        lines.append("=" * 60)
+        log.info("\n".join(lines))
+        _log_buffer.flush()
         
         return results
     
-    def _execute_step(self, step: Dict[str, Any]) -> Dict[str, Any]:
+    def flush_state_updates(self):
+        """Upisi sva nagomilana stanja koraka u ontologiju odjednom"""
+        if not self._pending_state_updates:
+            return
+        
+        updates, self._pending_state_updates = self._pending_state_updates, []
+        self.mapper.update_step_states(updates)
+    
+    def _execute_step(self, step: NormalizedStep) -> Dict[str, Any]:
         """Izvrsi pojedinacni korak"""
         result = {
-            "step_id": step["id"],
-            "action": step["action"],
-            "target": step.get("target", ""),
+            "step_id": step.id,
+            "action": step.action,
+            "target": step.target,
             "success": False,
             "error": None
         }
         
-        action = step["action"]
-        target = step.get("target", "")
-        value = step.get("value")
+        action = step.action
+        
+        log.info("\n[Step %s] %s → %s", step.id, action.upper(), step.target)
+        if step.description and log.isEnabledFor(logging.DEBUG):
+            log.debug("   %s", step.description)
         
-        print(f"\n[Step {step['id']}] {action.upper()} → {target}")
-        if step.get("description"):
-            print(f"   {step['description']}")
+        self._gate()
         
         try:
-            if action == "open_application":
-                self.performer.minimize_all()
-                time.sleep(1)
-                success = self.performer.open_application(target)
-                
-            elif action == "wait":
-                duration = int(value) if value else 3
-                success = self.performer.wait(duration)
-                
-            elif action == "click":
-                context = self._get_click_context(target)
-                element = self.analyzer.find_element_coordinates(target, context)
-                if element and element.get("found"):
-                    success = self.performer.click(element["x"], element["y"])
-                else:
-                    print(f"Element '{target}' not found")
-                    success = False
-                    
-            elif action == "double_click":
-                element = self.analyzer.find_element_coordinates(target)
-                if element and element.get("found"):
-                    success = self.performer.double_click(element["x"], element["y"])
-                else:
-                    success = False
-                    
-            elif action == "right_click":
-                element = self.analyzer.find_element_coordinates(target)
-                if element and element.get("found"):
-                    success = self.performer.right_click(element["x"], element["y"])
-                else:
-                    success = False
-                    
-            elif action == "type_text":
-                if target.lower() not in ["editor", "screen", ""]:
-                    element = self.analyzer.find_element_coordinates(target)
-                    if element and element.get("found"):
-                        self.performer.click(element["x"], element["y"])
-                        time.sleep(0.3)
-                
-                success = self.performer.type_text_with_clipboard(value or "")
-                
-            elif action == "key_press":
-                key = value or target
-                success = self.performer.press_key(key.lower())
-                
-            elif action == "key_combination":
-                keys = (value or target).lower().replace(" ", "").split("+")
-                success = self.performer.key_combination(*keys)
-                
-            elif action == "scroll":
-                amount = int(value) if value else -3
-                success = self.performer.scroll(amount)
-                
-            else:
-                print(f"Unknown action: {action}")
-                success = False
+            handler = self._dispatch.get(action)
+            success = handler(step) if handler else self._unknown(action)
             
             result["success"] = success
             
             if success:
-                print(f"OK")
+                log.info("OK")
             else:
-                print(f"Failed")
+                log.info("Failed")
                 
         except Exception as e:
             result["error"] = str(e)
-            print(f"Error: {e}")
+            log.error("Error: %s", e)
         
         return result
     
+    def _do_open(self, step: NormalizedStep) -> bool:
+        """Otvori aplikaciju"""
+        self._gate(1)
+        self.performer.minimize_all()
+        self._gate()
+        success = self.performer.open_application(step.target)
+        self._invalidate_element_cache()
+        return success
+    
+    def _do_wait(self, step: NormalizedStep) -> bool:
+        """Sacekaj zadati broj sekundi"""
+        value = step.value
+        duration = int(value) if value else 3
+        return self.performer.wait(duration)
+    
+    def _do_click(self, step: NormalizedStep) -> bool:
+        """Klikni na element"""
+        target = step.target
+        context = self._get_click_context(target)
+        element = self._lookup_element(target, context)
+        if element and element.get("found"):
+            success = self.performer.click(element["x"], element["y"])
+            self._invalidate_element_cache()
+            return success
+        
+        log.info("Element '%s' not found", target)
+        return False
+    
+    def _do_double_click(self, step: NormalizedStep) -> bool:
+        """Dupli klik na element"""
+        element = self._lookup_element(step.target)
+        if element and element.get("found"):
+            success = self.performer.double_click(element["x"], element["y"])
+            self._invalidate_element_cache()
+            return success
+        return False
+    
+    def _do_right_click(self, step: NormalizedStep) -> bool:
+        """Desni klik na element"""
+        element = self._lookup_element(step.target)
+        if element and element.get("found"):
+            success = self.performer.right_click(element["x"], element["y"])
+            self._invalidate_element_cache()
+            return success
+        return False
+    
+    def _do_type_text(self, step: NormalizedStep) -> bool:
+        """Unesi tekst, po potrebi u zadato polje"""
+        target = step.target
+        if target.lower() not in ["editor", "screen", ""]:
+            element = self._lookup_element(target)
+            if element and element.get("found"):
+                self._gate(0.3)
+                self.performer.click(element["x"], element["y"])
+                self._invalidate_element_cache()
+                self._gate()
+        
+        return self.performer.type_text_with_clipboard(step.value or "")
+    
+    def _do_key_press(self, step: NormalizedStep) -> bool:
+        """Pritisni taster"""
+        key = (step.value or step.target).lower()
+        success = self.performer.press_key(key)
+        if key in self.SCREEN_CHANGING_KEYS:
+            self._invalidate_element_cache()
+        return success
+    
+    def _do_key_combination(self, step: NormalizedStep) -> bool:
+        """Pritisni kombinaciju tastera"""
+        keys = (step.value or step.target).lower().replace(" ", "").split("+")
+        success = self.performer.key_combination(*keys)
+        self._invalidate_element_cache()
+        return success
+    
+    def _do_scroll(self, step: NormalizedStep) -> bool:
+        """Skroluj"""
+        value = step.value
+        amount = int(value) if value else -3
+        success = self.performer.scroll(amount)
+        self._invalidate_element_cache()
+        return success
+    
+    def _unknown(self, action: str) -> bool:
+        """Akcija koju executor ne podrzava"""
+        log.warning("Unknown action: %s", action)
+        return False
+    
+    def _defer(self, seconds: float):
+        """Sljedeca akcija ne smije poceti prije nego sto prodje seconds"""
+        self._deadline = max(self._deadline, time.monotonic() + seconds)
+    
+    def _gate(self, seconds: float = 0.0):
+        """Sacekaj samo ostatak prethodnog roka, pa postavi novi rok"""
+        now = time.monotonic()
+        if now < self._deadline:
+            time.sleep(self._deadline - now)
+        self._deadline = max(now, self._deadline) + seconds
+    
+    def _lookup_element(self, target: str, context: str = "") -> Optional[Dict[str, Any]]:
+        """Pronadji element, koristeci kes dok se ekran nije promijenio"""
+        key = (target, context)
+        cached = self._element_cache.get(key)
+        now = time.monotonic()
+        
+        if cached and now - cached[0] < self.ELEMENT_CACHE_TTL:
+            log.debug("   Using cached position for '%s'", target)
+            return cached[1]
+        
+        element = self.analyzer.find_element_coordinates(target, context)
+        if element and element.get("found"):
+            self._element_cache[key] = (now, element)
+        
+        return element
+    
+    def _invalidate_element_cache(self):
+        """Ekran se promijenio, kesirane koordinate vise ne vaze"""
+        self._element_cache.clear()
+    
     def _get_click_context(self, target: str) -> str:
         """Generisi kontekst za Vision AI"""
-        t = target.lower()
+        kind = classify_target(target)
         
-        if t in ["file", "edit", "view", "tools", "help"]:
+        if kind == MENU:
             return f"Look for '{target}' in the TOP MENU BAR."
-        elif "search" in t:
+        elif kind == SEARCH:
             return f"Look for a SEARCH BOX or SEARCH INPUT FIELD."
-        elif "address" in t or "url" in t:
+        elif kind == ADDRESS:
             return f"Look for the BROWSER ADDRESS BAR at the top."
-        elif any(word in t for word in ["button", "next", "ok", "cancel", "create"]):
+        elif kind == BUTTON:
             return f"Look for a BUTTON labeled '{target}'."
         else:
             return f"Look for a clickable element labeled '{target}'."
\ No newline at end of file
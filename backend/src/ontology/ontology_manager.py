@@ -1,7 +1,8 @@
 import os
 from rdflib import Graph, Namespace, RDF, RDFS, OWL, Literal, URIRef
 from rdflib.namespace import XSD
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from ..models import NormalizedStep
 
 
 class OntologyManager:
@@ -18,6 +19,15 @@ class OntologyManager:
         "close_application", "scroll", "move_mouse"
     ]
     
+    # Stanja koraka
+    STATE_MAP = {
+        "pending": CU.PendingState,
+        "executing": CU.ExecutingState,
+        "completed": CU.CompletedState,
+        "failed": CU.FailedState,
+        "skipped": CU.SkippedState
+    }
+    
     def __init__(self, ontology_path: str = None):
         """
         Inicijalizuj ontology manager.
@@ -122,7 +132,7 @@ class OntologyManager:
         
         Args:
             task_id: Jedinstveni ID taska
-            task_data: Dict sa goal, original_instruction, steps, itd.
+            task_data: Dict sa goal, original_instruction, steps (NormalizedStep), itd.
             
         Returns:
             URI taska
@@ -161,10 +171,10 @@ class OntologyManager:
         
         return task_uri
     
-    def _add_step_to_graph(self, task_uri: URIRef, step: Dict[str, Any], 
+    def _add_step_to_graph(self, task_uri: URIRef, step: NormalizedStep, 
                            previous_step: Optional[URIRef] = None) -> URIRef:
         """Dodaj korak u graf"""
-        step_id = step.get("id", 0)
+        step_id = step.id
         step_uri = URIRef(f"{task_uri}_Step_{step_id}")
         
         # Osnovni triplete
@@ -172,24 +182,24 @@ class OntologyManager:
         self.graph.add((task_uri, self.CU.hasStep, step_uri))
         self.graph.add((step_uri, self.CU.stepOrder, Literal(step_id, datatype=XSD.integer)))
         
-        if step.get("description"):
-            self.graph.add((step_uri, self.CU.stepDescription, Literal(step["description"])))
+        if step.description:
+            self.graph.add((step_uri, self.CU.stepDescription, Literal(step.description)))
         
-        if step.get("expected_result"):
-            self.graph.add((step_uri, self.CU.expectedResult, Literal(step["expected_result"])))
+        if step.expected_result:
+            self.graph.add((step_uri, self.CU.expectedResult, Literal(step.expected_result)))
         
         # Akcija
-        action_name = step.get("action", "click")
+        action_name = step.action or "click"
         action_uri = self.CU[action_name]
         self.graph.add((step_uri, self.CU.hasAction, action_uri))
         
         # Target
-        target = step.get("target", "")
+        target = step.target
         if target:
             self.graph.add((step_uri, self.CU.targetName, Literal(target)))
         
         # Value - zavisno od akcije
-        value = step.get("value")
+        value = step.value
         if value:
             if action_name == "wait":
                 try:
@@ -215,7 +225,7 @@ class OntologyManager:
         
         return step_uri
     
-    def get_task_steps(self, task_uri: URIRef) -> List[Dict[str, Any]]:
+    def get_task_steps(self, task_uri: URIRef) -> List[NormalizedStep]:
         """Dobija sve korake za task, sortirane po redoslijedu"""
         
         query = f"""
@@ -249,38 +259,48 @@ class OntologyManager:
             elif row.keyVal:
                 value = str(row.keyVal)
             
-            steps.append({
-                "uri": str(row.step),
-                "id": int(row.order),
-                "action": str(row.action).split("#")[-1],
-                "target": str(row.target) if row.target else "",
-                "value": value,
-                "description": str(row.description) if row.description else "",
-                "expected_result": str(row.expected) if row.expected else ""
-            })
+            steps.append(NormalizedStep(
+                uri=str(row.step),
+                id=int(row.order),
+                action=str(row.action).split("#")[-1],
+                target=str(row.target) if row.target else "",
+                value=value,
+                description=str(row.description) if row.description else "",
+                expected_result=str(row.expected) if row.expected else ""
+            ))
         
         return steps
     
     def update_step_state(self, step_uri: URIRef, state: str):
         """Azuriraj stanje koraka"""
-        state_map = {
-            "pending": self.CU.PendingState,
-            "executing": self.CU.ExecutingState,
-            "completed": self.CU.CompletedState,
-            "failed": self.CU.FailedState,
-            "skipped": self.CU.SkippedState
-        }
+        self.update_step_states([(step_uri, state)])
+    
+    def update_step_states(self, updates: List[Tuple[URIRef, str]]):
+        """
+        Azuriraj stanja vise koraka odjednom.
         
-        state_uri = state_map.get(state.lower(), self.CU.PendingState)
+        Args:
+            updates: Lista (step_uri, state) parova
+        """
+        if not updates:
+            return
         
-        # Ukloni staro stanje
-        if isinstance(step_uri, str):
-            step_uri = URIRef(step_uri)
+        # Isti korak vise puta u jednom batchu - vazi posljednje stanje
+        latest = {
+            (step_uri if isinstance(step_uri, URIRef) else URIRef(step_uri)): state
+            for step_uri, state in updates
+        }
         
-        self.graph.remove((step_uri, self.CU.hasState, None))
+        new_triples = []
+        for step_uri, state in latest.items():
+            state_uri = self.STATE_MAP.get(state.lower(), self.CU.PendingState)
+            
+            # Ukloni staro stanje
+            self.graph.remove((step_uri, self.CU.hasState, None))
+            new_triples.append((step_uri, self.CU.hasState, state_uri, self.graph))
         
-        # Dodaj novo stanje
-        self.graph.add((step_uri, self.CU.hasState, state_uri))
+        # Dodaj nova stanja
+        self.graph.addN(new_triples)
     
     def save_ontology(self, path: str, format: str = "turtle"):
         """
@@ -1,7 +1,18 @@
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, Optional, List, Tuple
 from rdflib import URIRef
 import uuid
 from .ontology_manager import OntologyManager
+from ..models import NormalizedStep
+
+_DIGITS_RE = re.compile(r'\d+')
+
+# Validne akcije
+_VALID_ACTIONS = frozenset({
+    "click", "double_click", "right_click", "type_text",
+    "key_press", "key_combination", "wait", "open_application",
+    "close_application", "scroll", "move_mouse"
+})
 
 
 class PlanMapper:
@@ -10,18 +21,26 @@ class PlanMapper:
     def __init__(self, ontology_manager: OntologyManager = None):
         self.ontology = ontology_manager or OntologyManager()
     
-    def map_plan_to_ontology(self, plan_dict: Dict[str, Any]) -> URIRef:
+    @staticmethod
+    def new_task_id() -> str:
+        """Generisi kratki jedinstveni ID taska"""
+        return str(uuid.uuid4())[:8]
+    
+    def map_plan_to_ontology(self, plan_dict: Dict[str, Any],
+                             task_id: Optional[str] = None) -> Tuple[URIRef, str]:
         """
         Mapiraj JSON plan na ontologiju.
         
         Args:
             plan_dict: task_plan.json kao dict
+            task_id: ID taska (generise se ako nije zadat)
             
         Returns:
-            URI kreiranog Task-a
+            Tuple[URI kreiranog Task-a, ID taska]
         """
         # Generisi ID
-        task_id = str(uuid.uuid4())[:8]
+        if task_id is None:
+            task_id = self.new_task_id()
         
         # Validacija strukture
         self._validate_plan_structure(plan_dict)
@@ -35,7 +54,7 @@ class PlanMapper:
         print(f"[PlanMapper] Mapped plan: {task_uri}")
         print(f"[PlanMapper] Step number: {len(normalized_plan.get('steps', []))}")
         
-        return task_uri
+        return task_uri, task_id
     
     def _validate_plan_structure(self, plan: Dict[str, Any]):
         """Validacija da li plan ima potrebne kljuceve"""
@@ -67,17 +86,10 @@ class PlanMapper:
         
         return normalized
     
-    def _normalize_step(self, step: Dict[str, Any], default_id: int) -> Dict[str, Any]:
+    def _normalize_step(self, step: Dict[str, Any], default_id: int) -> NormalizedStep:
         """Normalizacija pojedinacnog koraka"""
-        # Validne akcije
-        valid_actions = [
-            "click", "double_click", "right_click", "type_text",
-            "key_press", "key_combination", "wait", "open_application",
-            "close_application", "scroll", "move_mouse"
-        ]
-        
         action = step.get("action", "click").lower()
-        if action not in valid_actions:
+        if action not in _VALID_ACTIONS:
             print(f"[PlanMapper] WARNING: Unknown action '{action}', using 'click'")
             action = "click"
         
@@ -88,23 +100,26 @@ class PlanMapper:
             
             # Izvuci broj za wait akciju
             if action == "wait":
-                import re
-                numbers = re.findall(r'\d+', value)
+                numbers = _DIGITS_RE.findall(value)
                 value = numbers[0] if numbers else "4"
         
-        return {
-            "id": step.get("id", default_id),
-            "action": action,
-            "target": step.get("target", ""),
-            "value": value,
-            "description": step.get("description", ""),
-            "expected_result": step.get("expected_result", "")
-        }
+        return NormalizedStep(
+            id=step.get("id", default_id),
+            action=action,
+            target=step.get("target", ""),
+            value=value,
+            description=step.get("description", ""),
+            expected_result=step.get("expected_result", "")
+        )
     
-    def get_steps_from_ontology(self, task_uri: URIRef) -> list:
+    def get_steps_from_ontology(self, task_uri: URIRef) -> List[NormalizedStep]:
         """Dobavljanje koraka za izvrsavanje iz ontologije"""
         return self.ontology.get_task_steps(task_uri)
     
     def update_step_state(self, step_uri: str, state: str):
         """Azuriranje stanja koraka u ontologiji"""
-        self.ontology.update_step_state(URIRef(step_uri), state)
\ No newline at end of file
+        self.ontology.update_step_state(URIRef(step_uri), state)
+    
+    def update_step_states(self, updates: List[Tuple[str, str]]):
+        """Grupno azuriranje stanja koraka u ontologiji"""
+        self.ontology.update_step_states([(URIRef(uri), state) for uri, state in updates])
\ No newline at end of file
@@ -1,13 +1,39 @@
-from typing import Dict, Any, List, Tuple
-from .ontology_manager import OntologyManager
+import re
+import fastjsonschema
+from typing import Dict, Any, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .ontology_manager import OntologyManager
+
+_DIGITS_RE = re.compile(r'\d+')
+
+# Struktura plana (pravila za pojedinacne korake su u _check_step)
+_PLAN_SCHEMA = {
+    "type": "object",
+    "required": ["goal", "steps"],
+    "properties": {
+        "steps": {
+            "type": "array",
+            "minItems": 1,
+            "items": {"type": "object"}
+        }
+    }
+}
+
+# Kompajlira se jednom po procesu
+_validate_plan_schema = fastjsonschema.compile(_PLAN_SCHEMA)
 
 
 class PlanValidator:
     """Validira konzistentnost plana prema ontologiji"""
     
-    def __init__(self, ontology_manager: OntologyManager = None):
-        self.ontology = ontology_manager or OntologyManager()
-        self.valid_actions = self.ontology.get_valid_actions()
+    def __init__(self, ontology_manager: "OntologyManager" = None):
+        if ontology_manager is None:
+            from .ontology_manager import OntologyManager
+            ontology_manager = OntologyManager()
+        self.ontology = ontology_manager
+        self.valid_actions = frozenset(self.ontology.get_valid_actions())
+        self._valid_actions_str = ", ".join(sorted(self.valid_actions))
     
     def validate_plan(self, plan: Dict[str, Any]) -> Tuple[bool, List[str], List[str]]:
         """
@@ -26,22 +52,29 @@ class PlanValidator:
         if errors:
             return False, errors, warnings
         
-        # Validacija koraka
-        steps = plan.get("steps", [])
+        # Validacija koraka i sekvence u jednom prolazu
+        prev_action = None
+        has_search = False
         
-        for i, step in enumerate(steps):
-            step_errors, step_warnings = self._validate_step(step, i, steps)
+        for i, step in enumerate(plan.get("steps", [])):
+            step_errors, step_warnings, prev_action, has_search = self._check_step(
+                step, i, prev_action, has_search
+            )
             errors.extend(step_errors)
             warnings.extend(step_warnings)
         
-        # Validacija sekvence
-        sequence_warnings = self._validate_sequence(steps)
-        warnings.extend(sequence_warnings)
-        
         return len(errors) == 0, errors, warnings
     
     def _validate_structure(self, plan: Dict[str, Any]) -> List[str]:
         """Validacija strukture plana"""
+        # Brza provjera kompajliranom semom - ispravan plan je obicni slucaj
+        try:
+            _validate_plan_schema(plan)
+            return []
+        except fastjsonschema.JsonSchemaException:
+            pass
+        
+        # Neispravan plan: rucne provjere daju sve greske, sa istim porukama
         errors = []
         
         if "goal" not in plan:
@@ -53,91 +86,79 @@ class PlanValidator:
             errors.append("'steps' must be a list")
         elif len(plan["steps"]) == 0:
             errors.append("Plan must have at least one step")
+        else:
+            for i, step in enumerate(plan["steps"]):
+                if not isinstance(step, dict):
+                    errors.append(f"Step {i + 1}: must be an object")
         
         return errors
     
-    def _validate_step(self, step: Dict[str, Any], index: int, 
-                       all_steps: List[Dict]) -> Tuple[List[str], List[str]]:
-        """Validacija pojedinacnih koraka"""
+    def _check_step(self, step: Dict[str, Any], index: int, prev_action: Optional[str],
+                    has_search: bool) -> Tuple[List[str], List[str], str, bool]:
+        """
+        Validacija pojedinacnog koraka i njegovog mjesta u sekvenci.
+        
+        Returns:
+            Tuple[errors, warnings, action, has_search] - action i has_search
+            se prosljedjuju provjeri sljedeceg koraka
+        """
         errors = []
         warnings = []
         step_num = index + 1
         
-        # Akcija
         action = step.get("action", "")
+        target = step.get("target", "")
+        value = step.get("value")
+        
+        # Pravilo 1: Preporuci wait nakon open_application
+        if prev_action == "open_application" and action != "wait":
+            warnings.append(
+                f"Step {index}: It is recommended to add 'wait' after 'open_application'"
+            )
+        
+        # Akcija
         if not action:
             errors.append(f"Step {step_num}: Missing 'action'")
         elif action not in self.valid_actions:
             errors.append(f"Step {step_num}: Unknown action '{action}'. "
-                         f"Valid actions: {', '.join(self.valid_actions)}")
+                         f"Valid actions: {self._valid_actions_str}")
         
         # Target za odredjene akcije
         actions_requiring_target = ["click", "double_click", "right_click", "type_text"]
         if action in actions_requiring_target:
-            target = step.get("target", "")
             if not target or target == "screen":
                 warnings.append(f"Step {step_num}: '{action}' missing specific target")
         
         # Value za type_text
         if action == "type_text":
-            if not step.get("value"):
+            if not value:
                 errors.append(f"Step {step_num}: 'type_text' requires 'value'")
         
         # Value za key_press
         if action == "key_press":
-            if not step.get("value") and not step.get("target"):
+            if not value and not target:
                 errors.append(f"Step {step_num}: 'key_press' requires key name")
         
         # Value za wait
         if action == "wait":
-            value = step.get("value")
             if value:
                 try:
-                    import re
-                    numbers = re.findall(r'\d+', str(value))
+                    numbers = _DIGITS_RE.findall(str(value))
                     if not numbers:
                         errors.append(f"Step {step_num}: 'wait' value must be a number")
                 except:
                     errors.append(f"Step {step_num}: Invalid wait value")
         
-        return errors, warnings
-    
-    def _validate_sequence(self, steps: List[Dict]) -> List[str]:
-        """Validacija sekvence koraka"""
-        warnings = []
-        
-        if not steps:
-            return warnings
+        # Pravilo 2: click na YouTube video nakon pretrage
+        if action == "type_text" and "search" in target.lower():
+            has_search = True
         
-        # Pravilo 1: Preporuci wait nakon open_application
-        for i, step in enumerate(steps):
-            if step.get("action") == "open_application":
-                if i + 1 < len(steps):
-                    next_step = steps[i + 1]
-                    if next_step.get("action") != "wait":
-                        warnings.append(
-                            f"Step {i + 1}: It is recommended to add 'wait' after 'open_application'"
-                        )
+        if has_search and action == "click" and not target:
+            warnings.append(
+                f"Step {step_num}: Click after search should have a specific target"
+            )
         
-        # Pravilo 2: click na YouTube video nakon pretrage
-        has_youtube_search = False
-        for i, step in enumerate(steps):
-            if step.get("action") == "type_text":
-                target = step.get("target", "").lower()
-                if "search" in target:
-                    has_youtube_search = True
-            
-            if has_youtube_search and step.get("action") == "click":
-                target = step.get("target", "")
-                if target:
-                    # OK - ima specifican target za klik
-                    pass
-                else:
-                    warnings.append(
-                        f"Step {i + 1}: Click after search should have a specific target"
-                    )
-        
-        return warnings
+        return errors, warnings, action, has_search
     
     def get_validation_report(self, plan: Dict[str, Any]) -> Dict[str, Any]:
         """Generisanje izvjestaja o validaciji"""
@@ -0,0 +1,235 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+# Svaka verzija prompta+modela ima svoje fajlove u ovom folderu
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "task_decomposer")
+
+
+class PlanCache:
+    """Kes generisanih planova: L1 u memoriji procesa, L2 u SQLite bazi"""
+
+    # Broj planova u memoriji (dijeli se izmedju instanci)
+    L1_SIZE = 256
+
+    # Koliko dugo je plan na disku validan (sekunde)
+    TTL = 30 * 24 * 3600
+
+    _l1: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+    _l1_lock = threading.Lock()
+
+    def __init__(self, path: str = None, version: str = "default"):
+        """
+        Args:
+            path: Putanja do SQLite baze (default: TASK_DECOMPOSER_CACHE ili
+                ~/.cache/task_decomposer/{version}.db)
+            version: Verzija prompta i modela - planovi starih verzija se ne koriste
+        """
+        self.path = (path or os.getenv("TASK_DECOMPOSER_CACHE")
+                     or os.path.join(DEFAULT_CACHE_DIR, f"{version}.db"))
+        self._lock = threading.Lock()
+
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache "
+                "(key TEXT PRIMARY KEY, plan_json TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            columns = [row[1] for row in self._conn.execute("PRAGMA table_info(cache)")]
+            if "expires_at" not in columns:
+                # Baza bez TTL kolone - stari redovi odmah isticu
+                self._conn.execute(
+                    "ALTER TABLE cache ADD COLUMN expires_at REAL NOT NULL DEFAULT 0"
+                )
+            self._conn.execute("DELETE FROM cache WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            print(f"[PlanCache] Disk cache unavailable: {e}")
+            self._conn = None
+
+        if folder == DEFAULT_CACHE_DIR:
+            self._prune_old_versions()
+
+    def _prune_old_versions(self):
+        """Obrisi fajlove drugih verzija koji nisu korisceni duze od TTL"""
+        cutoff = time.time() - self.TTL
+        try:
+            for name in os.listdir(DEFAULT_CACHE_DIR):
+                path = os.path.join(DEFAULT_CACHE_DIR, name)
+                if path != self.path and name.endswith(".db") and os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    print(f"[PlanCache] Removed old cache version: {name}")
+        except OSError as e:
+            print(f"[PlanCache] Prune error: {e}")
+
+    def get(self, key: str) -> Optional[str]:
+        """Vrati JSON plana za kljuc, ili None"""
+        with self._l1_lock:
+            plan_json = self._l1.get((self.path, key))
+            if plan_json is not None:
+                self._l1.move_to_end((self.path, key))
+                return plan_json
+
+        if self._conn is None:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT plan_json FROM cache WHERE key = ? AND expires_at > ?",
+                    (key, time.time())
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"[PlanCache] Read error: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        self._remember(key, row[0])
+        return row[0]
+
+    def put(self, key: str, plan_json: str):
+        """Sacuvaj JSON plana pod kljucem"""
+        self._remember(key, plan_json)
+
+        if self._conn is None:
+            return
+
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO cache (key, plan_json, expires_at) VALUES (?, ?, ?)",
+                    (key, plan_json, time.time() + self.TTL)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"[PlanCache] Write error: {e}")
+
+    def _remember(self, key: str, plan_json: str):
+        with self._l1_lock:
+            self._l1[(self.path, key)] = plan_json
+            self._l1.move_to_end((self.path, key))
+            if len(self._l1) > self.L1_SIZE:
+                self._l1.popitem(last=False)
+
+
+class SemanticPlanCache:
+    """Kes planova po slicnosti ulaza (sentence-transformers + FAISS)"""
+
+    MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+    # Minimalna kosinusna slicnost za pogodak
+    THRESHOLD = 0.92
+
+    def __init__(self, index_path: str = None, plans_path: str = None, version: str = "default"):
+        """
+        Args:
+            index_path: Putanja do FAISS indeksa
+            plans_path: Putanja do JSON liste planova (paralelno sa indeksom)
+            version: Verzija prompta i modela (odredjuje default putanje)
+        """
+        import faiss
+        from sentence_transformers import SentenceTransformer
+
+        self._faiss = faiss
+        self.model = SentenceTransformer(self.MODEL_NAME)
+        self.index_path = index_path or os.path.join(DEFAULT_CACHE_DIR, f"{version}.faiss")
+        self.plans_path = plans_path or os.path.join(DEFAULT_CACHE_DIR, f"{version}_plans.json")
+        self._lock = threading.Lock()
+        self._last_embedding = None
+
+        if os.path.exists(self.index_path) and os.path.exists(self.plans_path):
+            self.index = faiss.read_index(self.index_path)
+            with open(self.plans_path, "r", encoding="utf-8") as f:
+                self.plans = json.load(f)
+            print(f"[SemanticPlanCache] Loaded {len(self.plans)} plans")
+        else:
+            dim = self.model.get_sentence_embedding_dimension()
+            self.index = faiss.IndexFlatIP(dim)
+            self.plans = []
+
+        atexit.register(self.save)
+
+    def _embed(self, text: str):
+        # Posljednji vektor se pamti, jer put() obicno slijedi promasaj u get().
+        # Cita se jednom - drugi thread ga moze zamijeniti izmedju provjere i upotrebe
+        last = self._last_embedding
+        if last is not None and last[0] == text:
+            return last[1]
+
+        # Normalizovani vektori -> inner product je kosinusna slicnost
+        vec = self.model.encode([text], normalize_embeddings=True).astype("float32")
+        self._last_embedding = (text, vec)
+        return vec
+
+    def get(self, text: str) -> Optional[str]:
+        """Vrati JSON najslicnijeg plana, ako je dovoljno slican"""
+        vec = self._embed(text)
+
+        with self._lock:
+            if self.index.ntotal == 0:
+                return None
+            scores, ids = self.index.search(vec, 1)
+
+        if scores[0][0] >= self.THRESHOLD:
+            print(f"[SemanticPlanCache] Hit (similarity {scores[0][0]:.3f})")
+            return self.plans[ids[0][0]]
+        return None
+
+    def put(self, text: str, plan_json: str):
+        """Dodaj plan u indeks"""
+        vec = self._embed(text)
+
+        with self._lock:
+            self.index.add(vec)
+            self.plans.append(plan_json)
+
+    def save(self):
+        """Sacuvaj indeks i planove na disk"""
+        with self._lock:
+            if not self.plans:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+                self._faiss.write_index(self.index, self.index_path)
+                with open(self.plans_path, "w", encoding="utf-8") as f:
+                    json.dump(self.plans, f, ensure_ascii=False)
+            except OSError as e:
+                print(f"[SemanticPlanCache] Save error: {e}")
+
+
+_semantic_cache = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache(version: str = "default") -> Optional[SemanticPlanCache]:
+    """
+    Zajednicki semanticki kes, ili None.
+    
+    Ukljucuje se sa TASK_DECOMPOSER_SEMANTIC_CACHE=1 i zahtijeva
+    sentence-transformers i faiss.
+    """
+    global _semantic_cache
+
+    if os.getenv("TASK_DECOMPOSER_SEMANTIC_CACHE") != "1":
+        return None
+
+    with _semantic_cache_lock:
+        if _semantic_cache is None:
+            try:
+                _semantic_cache = SemanticPlanCache(version=version)
+            except ImportError as e:
+                print(f"[SemanticPlanCache] Disabled, missing dependency: {e}")
+                _semantic_cache = False
+
+    return _semantic_cache or None
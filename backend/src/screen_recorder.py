@@ -3,6 +3,7 @@ import subprocess
 import time
 import shutil
 import signal
+import threading
 from datetime import datetime
 from typing import Optional
 import pyautogui
@@ -17,6 +18,9 @@ class ScreenRecorder:
         self.is_recording = False
         self.current_video_path:  Optional[str] = None
         
+        # Postavlja se kada FFmpeg zaista pocne da snima
+        self.ready_event = threading.Event()
+        
         # Screen info
         self.screen_width, self.screen_height = pyautogui.size()
         
@@ -127,6 +131,22 @@ class ScreenRecorder:
             print(f"[ScreenRecorder] Conversion error:  {e}")
             return mkv_path
     
+    def _watch_ffmpeg_output(self, process: subprocess.Popen):
+        """Cita FFmpeg stderr i javlja kada je snimanje pocelo"""
+        tail = b""
+        try:
+            for chunk in iter(lambda: process.stderr.read1(1024), b""):
+                if not self.ready_event.is_set():
+                    tail = (tail + chunk)[-2048:]
+                    if b"Press [q]" in tail or b"frame=" in tail:
+                        self.ready_event.set()
+        except Exception:
+            pass
+    
+    def wait_ready(self, timeout: float = 2.0) -> bool:
+        """Sacekaj da FFmpeg pocne da snima (najvise timeout sekundi)"""
+        return self.ready_event.wait(timeout)
+    
     def start_recording(self, video_name:  Optional[str] = None) -> Optional[str]:
         if self.ffmpeg_path is None:
             print("[ScreenRecorder] FFmpeg not available!")
@@ -168,6 +188,8 @@ class ScreenRecorder:
         print(f"\n[ScreenRecorder] Starting recording...")
         print(f"[ScreenRecorder] Output: {self.current_video_path}")
         
+        self.ready_event.clear()
+        
         try:
             startupinfo = subprocess. STARTUPINFO()
             startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
@@ -189,6 +211,13 @@ class ScreenRecorder:
                 print(f"[ScreenRecorder] FFmpeg error: {stderr. decode()[:300]}")
                 return None
             
+            # Citanje stderr-a i u pozadini, da se pipe ne napuni
+            threading.Thread(
+                target=self._watch_ffmpeg_output,
+                args=(self.process,),
+                daemon=True
+            ).start()
+            
             self.is_recording = True
             print("[ScreenRecorder] Recording started!")
             
@@ -240,6 +269,7 @@ class ScreenRecorder:
         
         self. is_recording = False
         self.process = None
+        self.ready_event.clear()
         
         time.sleep(2)
         
@@ -286,7 +316,7 @@ class RecordingSession:
     
     def __enter__(self):
         self.video_path = self.recorder.start_recording(self.video_name)
-        time.sleep(1)
+        self.recorder.wait_ready(timeout=1.0)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
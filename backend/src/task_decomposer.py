@@ -224,85 +224,83 @@
 #         print("\n" + "-" * 70)
 #         print(f"Success criteria: {plan. success_criteria}")
 #         print("=" * 70 + "\n")
-from groq import Groq
-import json
+from groq import AsyncGroq, APIError
+import asyncio
+import hashlib
 import os
 import re
+import httpx
+import orjson
+from typing import Any, Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 from .models import ParsedInput, TaskPlan, Step, ActionType
 from .ontology import OntologyManager, PlanValidator
+from .plan_cache import PlanCache, get_semantic_cache
+from .llm_client import get_groq_client
 
 load_dotenv()
 
-
-class TaskDecomposer:
-    """Kreira i validira plan koristeci ontologiju"""
+_DIGITS_RE = re.compile(r'\d+')
+_STEP_ERROR_RE = re.compile(r'^Step (\d+):')
+
+_ACTION_BY_VALUE = {a.value: a for a in ActionType}
+
+# Oznake akcija za print_plan
+_ACTION_LABELS = {
+    ActionType.CLICK:  "[CLICK]",
+    ActionType.DOUBLE_CLICK: "[DBL-CLICK]",
+    ActionType.TYPE_TEXT:  "[TYPE]",
+    ActionType.KEY_PRESS: "[KEY]",
+    ActionType.KEY_COMBINATION: "[COMBO]",
+    ActionType.WAIT: "[WAIT]",
+    ActionType.OPEN_APPLICATION: "[OPEN]",
+    ActionType.SCROLL: "[SCROLL]",
+    ActionType.RIGHT_CLICK: "[R-CLICK]",
+    ActionType.MOVE_MOUSE: "[MOVE]"
+}
+
+
+def _normalize_wait_value(value) -> str:
+    """Ocisti value za wait (ukloni "sekundi", "seconds", itd.), default 4"""
+    if value:
+        numbers = _DIGITS_RE.findall(str(value))
+        if numbers:
+            return numbers[0]
+    return "4"
+
+
+def _make_step(step_data: dict, index: int,
+               _abv=_ACTION_BY_VALUE, _normalize=_normalize_wait_value,
+               _WAIT=ActionType.WAIT, _CLICK=ActionType.CLICK, _Step=Step) -> Step:
+    """
+    Kreira Step iz koraka plana.
     
-    def __init__(self):
-        api_key = os.getenv("GROQ_API_KEY")
-        if not api_key:
-            raise ValueError("GROQ_API_KEY nije postavljen!")
-        
-        self.client = Groq(api_key=api_key)
-        self.model = "llama-3.3-70b-versatile"
-        
-        # Ontologija za validaciju
-        self.ontology = OntologyManager()
-        self.validator = PlanValidator(self.ontology)
-        
-        # Dobija validne akcije iz ontologije
-        self.valid_actions = self.ontology.get_valid_actions()
-        print(f"[TaskDecomposer] Validne akcije: {', '.join(self.valid_actions)}")
+    Default argumenti su lokalni aliasi (LOAD_FAST u petlji _create_task_plan).
+    """
+    action = _abv.get(step_data["action"])
+    if action is None:
+        print(f"[TaskDecomposer] Unknown action: {step_data['action']}, using CLICK")
+        action = _CLICK
     
-    def decompose(self, parsed_input: ParsedInput) -> TaskPlan:
-        """Kreira plan i validira ga prema ontologiji."""
-        
-        # Kreiraj prompt sa validnim akcijama iz ontologije
-        action_types = ", ".join(self.valid_actions)
-        
-        prompt = self._create_prompt(parsed_input, action_types)
-        
-        # Pozovi LLM
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=4096,
-            temperature=0.2
-        )
-        
-        response_text = response.choices[0].message.content.strip()
-        
-        # Parsiraj JSON
-        plan_data = self._parse_response(response_text)
-        
-        # Validiraj prema ontologiji
-        print("\n[TaskDecomposer] Validating plan against ontology...")
-        validation = self.validator.get_validation_report(plan_data)
-        
-        if not validation["is_valid"]:
-            print("[TaskDecomposer] Plan has errors, attempting to fix...")
-            for error in validation["errors"]:
-                print(f"Error: {error}")
-            plan_data = self._fix_plan(plan_data, validation["errors"])
-        
-        if validation["warnings"]:
-            for warning in validation["warnings"]:
-                print(f"Warning: {warning}")
-        
-        print(f"[TaskDecomposer] Plan created with {len(plan_data.get('steps', []))} steps")
-        
-        # Konvertuj u TaskPlan objekt
-        return self._create_task_plan(plan_data, parsed_input)
+    value = step_data.get("value")
+    if value is not None:
+        value = str(value)
+        # Za wait, ocisti value
+        if action is _WAIT:
+            value = _normalize(value)
     
-    def _create_prompt(self, parsed_input: ParsedInput, action_types: str) -> str:
-        """Kreiraj detaljan prompt za LLM."""
-        
-        return f"""You are an expert in desktop application automation. Create a DETAILED plan for a Computer Use AI agent.
-                    CONTEXT:
-                    - Goal: {parsed_input.intent}
-                    - Application: {parsed_input.application}
-                    - Programming language: {parsed_input.programming_language or "Not specified"}
-                    - Actions: {json.dumps(parsed_input.specific_actions, ensure_ascii=False)}
+    return _Step(
+        id=step_data.get("id", index),
+        action=action,
+        target=step_data.get("target", "screen"),
+        value=value,
+        description=step_data.get("description", ""),
+        expected_result=step_data.get("expected_result", "")
+    )
+
+
+# Staticni dio prompta - isti za svaki zahtjev (provider kesira prefiks)
+_SYSTEM_PROMPT_TEMPLATE = """You are an expert in desktop application automation. Create a DETAILED plan for a Computer Use AI agent.
 
                     AVAILABLE ACTIONS:
                     {action_types}
@@ -401,8 +399,6 @@ class TaskDecomposer:
 
                     ═══════════════════════════════════════════════════════════════════════════
 
-                    Now create a plan for the given task. Respond ONLY with a JSON object.
-
                     IMPORTANT: wait value MUST be a number as a string (e.g. "5"), NOT "5 seconds"!
                     IMPORTANT: target MUST be the EXACT text visible in the UI!
                     IMPORTANT: Verify EVERYTHING before sending the response!
@@ -410,23 +406,520 @@ class TaskDecomposer:
                     IMPORTANT: Go step by step in detail, NEVER SKIP STEPS!
                     IMPORTANT: Add wait after EVERY action that requires loading!"""
 
-    def _parse_response(self, response_text: str) -> dict:
-        # Ocisti markdown
-        if "```json" in response_text:
-            response_text = response_text.split("```json")[1].split("```")[0]
-        elif "```" in response_text:
-            response_text = response_text.split("```")[1].split("```")[0]
+# Dio prompta koji zavisi od zahtjeva
+_USER_PROMPT_TEMPLATE = """CONTEXT:
+                    - Goal: {intent}
+                    - Application: {application}
+                    - Programming language: {language}
+                    - Actions: {actions_json}
+
+                    Now create a plan for the given task. Respond ONLY with a raw JSON object. Do not use markdown code blocks."""
+
+# Kratak prompt za popravku samo neispravnih koraka
+_REPAIR_PROMPT_TEMPLATE = """Fix these steps of a desktop automation plan so they are valid.
+
+AVAILABLE ACTIONS: {action_types}
+
+STEPS:
+{broken_steps_json}
+
+ERRORS:
+{errors}
+
+Respond ONLY with a raw JSON object {{"steps": [...]}} containing the fixed steps in the same order, with the same ids."""
+
+
+class _StepStream:
+    """
+    Prati JSON plana dok stize u dijelovima i parsira svaki zavrseni korak.
+    
+    Koraci su jedini objekti na dubini 2 (plan -> steps -> korak), pa je
+    dovoljan brojac zagrada koji preskace sadrzaj stringova. Kada se
+    zatvori spoljni objekat, plan je kompletan (done) i ostatak se ignorise.
+    """
+    
+    def __init__(self, on_step=None):
+        self.on_step = on_step
+        self.steps: List[dict] = []
+        self._parts: List[str] = []
+        self._current: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self.done = False
+    
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+    
+    def feed(self, piece: str):
+        if self.done:
+            return
+        
+        for pos, ch in enumerate(piece):
+            if self._depth >= 2:
+                self._current.append(ch)
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+                if self._depth == 2:
+                    self._current = [ch]
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 1:
+                    self._step_done("".join(self._current))
+                elif self._depth == 0:
+                    self.done = True
+                    self._parts.append(piece[:pos + 1])
+                    return
+        
+        self._parts.append(piece)
+    
+    def _step_done(self, step_text: str):
+        try:
+            step = orjson.loads(step_text)
+        except orjson.JSONDecodeError:
+            return
+        self.steps.append(step)
+        if self.on_step:
+            self.on_step(step)
+
+
+class TaskDecomposer:
+    """Kreira i validira plan koristeci ontologiju"""
+    
+    # Najvise istovremenih LLM poziva u decompose_batch (Groq rate limit)
+    MAX_CONCURRENCY = 10
+    
+    # Limit izlaza za plan; ako se odgovor odsijece, ponovi sa vecim limitom
+    MAX_TOKENS = 2048
+    RETRY_MAX_TOKENS = 4096
+    
+    def __init__(self):
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise ValueError("GROQ_API_KEY nije postavljen!")
+        
+        self._api_key = api_key
+        self.client = get_groq_client(api_key)
+        self.model = "llama-3.3-70b-versatile"
+        
+        # Ontologija za validaciju
+        self.ontology = OntologyManager()
+        self.validator = PlanValidator(self.ontology)
+        
+        # Dobija validne akcije iz ontologije
+        self.valid_actions = self.ontology.get_valid_actions()
+        self._action_types_str = ", ".join(self.valid_actions)
+        print(f"[TaskDecomposer] Validne akcije: {self._action_types_str}")
+        
+        # Staticni system prompt (kreira se jednom, pri racunanju verzije)
+        self._sys_prompt = None
+        
+        # Verzija prompta i modela - kes prezivi restart dok se ona ne promijeni
+        self._prompt_version = hashlib.sha1(
+            (self._static_system_prompt() + _USER_PROMPT_TEMPLATE + self.model).encode()
+        ).hexdigest()[:8]
+        
+        # Kes odgovora za iste ulaze, i opciono za slicne ulaze
+        self.cache = PlanCache(version=self._prompt_version)
+        self.semantic_cache = get_semantic_cache(self._prompt_version)
+    
+    def decompose(self, parsed_input: ParsedInput) -> TaskPlan:
+        """Kreira plan i validira ga prema ontologiji."""
+        
+        cache_key, semantic_text, cached_plan = self._lookup_cache(parsed_input)
+        if cached_plan is not None:
+            return cached_plan
+        
+        # Pozovi LLM
+        stream = self._call_llm(self._build_messages(parsed_input))
+        
+        return self._finish_plan(stream, parsed_input, cache_key, semantic_text)
+    
+    async def decompose_async(self, parsed_input: ParsedInput, aclient: AsyncGroq = None) -> TaskPlan:
+        """
+        Isto kao decompose, ali ne blokira event loop tokom LLM poziva.
+        
+        Args:
+            aclient: Async klijent za pozive (default: novi klijent za ovaj poziv,
+                vezan za tekuci event loop i zatvoren na kraju)
+        """
+        cache_key, semantic_text, cached_plan = self._lookup_cache(parsed_input)
+        if cached_plan is not None:
+            return cached_plan
+        
+        if aclient is None:
+            async with AsyncGroq(api_key=self._api_key) as aclient:
+                return await self._decompose_with(aclient, parsed_input, cache_key, semantic_text)
+        
+        return await self._decompose_with(aclient, parsed_input, cache_key, semantic_text)
+    
+    async def _decompose_with(self, aclient: AsyncGroq, parsed_input: ParsedInput,
+                              cache_key: str, semantic_text: str) -> TaskPlan:
+        stream = await self._call_llm_async(aclient, self._build_messages(parsed_input))
+        
+        return await self._finish_plan_async(aclient, stream, parsed_input, cache_key, semantic_text)
+    
+    async def decompose_batch(self, inputs: List[ParsedInput]) -> List[TaskPlan]:
+        """Kreira planove za vise ulaza istovremeno (najvise MAX_CONCURRENCY poziva)."""
+        
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENCY)
+        
+        # Svi pozivi batcha dijele jedan HTTP klijent (HTTP/2 multipleksira
+        # zahtjeve kroz istu TCP/TLS konekciju); vezan je za tekuci event loop
+        async with self._batch_http_client() as http_client:
+            aclient = AsyncGroq(api_key=self._api_key, http_client=http_client)
+            
+            async def decompose_one(parsed_input: ParsedInput) -> TaskPlan:
+                async with semaphore:
+                    return await self.decompose_async(parsed_input, aclient)
+            
+            return await asyncio.gather(*(decompose_one(i) for i in inputs))
+    
+    def _batch_http_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self.MAX_CONCURRENCY,
+            max_keepalive_connections=self.MAX_CONCURRENCY
+        )
+        try:
+            return httpx.AsyncClient(http2=True, limits=limits)
+        except ImportError:
+            # http2=True zahtijeva paket h2 (httpx[http2] u requirements.txt)
+            print("[TaskDecomposer] h2 not installed, batch uses HTTP/1.1")
+            return httpx.AsyncClient(limits=limits)
+    
+    def _lookup_cache(self, parsed_input: ParsedInput) -> Tuple[str, str, Optional[TaskPlan]]:
+        """Vrati kljuceve kesa i plan iz kesa (ili None)"""
+        cache_key = self._cache_key(parsed_input)
+        semantic_text = self._semantic_text(parsed_input)
+        
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            print("[TaskDecomposer] Plan loaded from cache")
+            return cache_key, semantic_text, self._create_task_plan(orjson.loads(cached), parsed_input)
+        
+        if self.semantic_cache:
+            cached = self.semantic_cache.get(semantic_text)
+            if cached is not None:
+                print("[TaskDecomposer] Plan loaded from semantic cache")
+                self.cache.put(cache_key, cached)
+                return cache_key, semantic_text, self._create_task_plan(orjson.loads(cached), parsed_input)
+        
+        return cache_key, semantic_text, None
+    
+    def _build_messages(self, parsed_input: ParsedInput) -> List[Dict[str, str]]:
+        """Staticna pravila idu prva (system), podaci o zahtjevu na kraj"""
+        return [
+            {"role": "system", "content": self._static_system_prompt()},
+            {"role": "user", "content": self._dynamic_user_message(parsed_input)}
+        ]
+    
+    def _completion_kwargs(self, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        """Parametri LLM poziva, zajednicki za sync i async klijent"""
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": max_tokens,
+            "temperature": 0,
+            "seed": 42,
+            "response_format": {"type": "json_object"},
+            "stream": True
+        }
+    
+    def _call_llm(self, messages: List[Dict[str, str]]) -> _StepStream:
+        stream = self._stream_completion(messages, self.MAX_TOKENS)
+        if not stream.done:
+            print(f"[TaskDecomposer] Response truncated at {self.MAX_TOKENS} tokens, "
+                  f"retrying with {self.RETRY_MAX_TOKENS}")
+            stream = self._stream_completion(messages, self.RETRY_MAX_TOKENS)
+        return stream
+    
+    async def _call_llm_async(self, aclient: AsyncGroq, messages: List[Dict[str, str]]) -> _StepStream:
+        stream = await self._stream_completion_async(aclient, messages, self.MAX_TOKENS)
+        if not stream.done:
+            print(f"[TaskDecomposer] Response truncated at {self.MAX_TOKENS} tokens, "
+                  f"retrying with {self.RETRY_MAX_TOKENS}")
+            stream = await self._stream_completion_async(aclient, messages, self.RETRY_MAX_TOKENS)
+        return stream
+    
+    def _stream_completion(self, messages: List[Dict[str, str]], max_tokens: int) -> _StepStream:
+        stream = _StepStream(on_step=self._on_streamed_step)
+        response = self.client.chat.completions.create(**self._completion_kwargs(messages, max_tokens))
+        for chunk in response:
+            piece = chunk.choices[0].delta.content
+            if piece:
+                stream.feed(piece)
+            # JSON je zatvoren - ne cekaj (i ne placaj) ostatak generisanja
+            if stream.done:
+                response.close()
+                break
+        return stream
+    
+    async def _stream_completion_async(self, aclient: AsyncGroq, messages: List[Dict[str, str]],
+                                       max_tokens: int) -> _StepStream:
+        stream = _StepStream(on_step=self._on_streamed_step)
+        response = await aclient.chat.completions.create(**self._completion_kwargs(messages, max_tokens))
+        async for chunk in response:
+            piece = chunk.choices[0].delta.content
+            if piece:
+                stream.feed(piece)
+            if stream.done:
+                await response.close()
+                break
+        return stream
+    
+    def _call_llm_short(self, messages: List[Dict[str, str]]) -> str:
+        """Mali poziv bez streama (popravka koraka); greska vraca prazan odgovor"""
+        try:
+            response = self.client.chat.completions.create(**self._repair_kwargs(messages))
+        except APIError as e:
+            print(f"[TaskDecomposer] Repair call failed: {e}")
+            return ""
+        return response.choices[0].message.content or ""
+    
+    async def _call_llm_short_async(self, aclient: AsyncGroq, messages: List[Dict[str, str]]) -> str:
+        try:
+            response = await aclient.chat.completions.create(**self._repair_kwargs(messages))
+        except APIError as e:
+            print(f"[TaskDecomposer] Repair call failed: {e}")
+            return ""
+        return response.choices[0].message.content or ""
+    
+    def _repair_kwargs(self, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "messages": messages,
+            "max_tokens": 512,
+            "temperature": 0,
+            "seed": 42,
+            "response_format": {"type": "json_object"}
+        }
+    
+    def _on_streamed_step(self, step: dict):
+        """Provjera koraka cim stigne, dok model jos generise ostatak"""
+        action = step.get("action", "")
+        print(f"[TaskDecomposer] Step {step.get('id', '?')} received: {action}")
+        if action not in self.valid_actions:
+            print(f"[TaskDecomposer] Step {step.get('id', '?')}: unknown action '{action}'")
+    
+    def _finish_plan(self, stream: _StepStream, parsed_input: ParsedInput,
+                     cache_key: str, semantic_text: str) -> TaskPlan:
+        """Parsiraj, validiraj, po potrebi popravi i kesiraj odgovor LLM-a"""
+        plan_data, unresolved = self._check_plan(stream)
+        
+        repair = self._repair_request(plan_data, unresolved)
+        if repair:
+            indices, messages = repair
+            plan_data, unresolved = self._splice_repaired(
+                plan_data, unresolved, indices, self._call_llm_short(messages)
+            )
+        
+        return self._store_plan(plan_data, unresolved, stream.done, parsed_input, cache_key, semantic_text)
+    
+    async def _finish_plan_async(self, aclient: AsyncGroq, stream: _StepStream,
+                                 parsed_input: ParsedInput, cache_key: str,
+                                 semantic_text: str) -> TaskPlan:
+        """Isto kao _finish_plan, ali je poziv za popravku neblokirajuc"""
+        plan_data, unresolved = self._check_plan(stream)
+        
+        repair = self._repair_request(plan_data, unresolved)
+        if repair:
+            indices, messages = repair
+            plan_data, unresolved = self._splice_repaired(
+                plan_data, unresolved, indices, await self._call_llm_short_async(aclient, messages)
+            )
+        
+        return self._store_plan(plan_data, unresolved, stream.done, parsed_input, cache_key, semantic_text)
+    
+    def _check_plan(self, stream: _StepStream) -> Tuple[dict, List[str]]:
+        """Parsiraj i validiraj plan, lokalno popravi sto moze"""
+        
+        # Parsiraj JSON
+        plan_data = self._parse_response(stream.text.strip(), stream.steps)
+        
+        # Validiraj prema ontologiji
+        print("\n[TaskDecomposer] Validating plan against ontology...")
+        validation = self.validator.get_validation_report(plan_data)
+        
+        unresolved = []
+        if not validation["is_valid"]:
+            print("[TaskDecomposer] Plan has errors, attempting to fix...")
+            for error in validation["errors"]:
+                print(f"Error: {error}")
+            plan_data, unresolved = self._fix_plan(plan_data)
+        
+        if validation["warnings"]:
+            for warning in validation["warnings"]:
+                print(f"Warning: {warning}")
+        
+        if not stream.done:
+            print("[TaskDecomposer] Response was truncated, plan may be incomplete")
+        
+        return plan_data, unresolved
+    
+    def _repair_request(self, plan_data: dict, unresolved: List[str]) -> Optional[Tuple[List[int], List[Dict[str, str]]]]:
+        """
+        Kratak prompt samo sa neispravnim koracima i greskama.
+        
+        Returns:
+            (indeksi koraka, poruke) ili None ako nema sta da se popravi
+        """
+        if not unresolved:
+            return None
+        
+        steps = plan_data.get("steps", [])
+        indices = sorted({int(m.group(1)) - 1 for m in map(_STEP_ERROR_RE.match, unresolved) if m})
+        indices = [i for i in indices if i < len(steps)]
+        if not indices:
+            # Greske u strukturi plana - ne mogu se popraviti po koracima
+            print("[TaskDecomposer] Unresolved plan errors, no steps to repair")
+            return None
+        
+        print(f"[TaskDecomposer] Repairing {len(indices)} steps with LLM...")
+        broken_steps = orjson.dumps([steps[i] for i in indices]).decode()
+        content = _REPAIR_PROMPT_TEMPLATE.format(
+            action_types=self._action_types_str,
+            broken_steps_json=broken_steps,
+            errors="\n".join(unresolved)
+        )
+        return indices, [{"role": "user", "content": content}]
+    
+    def _splice_repaired(self, plan_data: dict, unresolved: List[str], indices: List[int],
+                         response_text: str) -> Tuple[dict, List[str]]:
+        """
+        Zamijeni neispravne korake popravljenim.
+        
+        Returns:
+            (plan, greske koje su ostale) - ako popravka ne uspije, plan i greske su nepromijenjeni
+        """
+        try:
+            repaired = orjson.loads(response_text).get("steps", [])
+        except (orjson.JSONDecodeError, AttributeError) as e:
+            print(f"[TaskDecomposer] Repair response is not valid JSON: {e}")
+            return plan_data, unresolved
+        
+        if len(repaired) != len(indices):
+            print(f"[TaskDecomposer] Repair returned {len(repaired)} steps, expected {len(indices)}")
+            return plan_data, unresolved
+        
+        steps = plan_data["steps"]
+        for i, step in zip(indices, repaired):
+            if isinstance(step, dict):
+                steps[i] = step
+        
+        plan_data, unresolved = self._fix_plan(plan_data)
+        for error in unresolved:
+            print(f"Error after repair: {error}")
+        return plan_data, unresolved
+    
+    def _store_plan(self, plan_data: dict, unresolved: List[str], complete: bool,
+                    parsed_input: ParsedInput, cache_key: str, semantic_text: str) -> TaskPlan:
+        """
+        Kesiraj i konvertuj plan.
+        
+        Args:
+            unresolved: Greske koje su ostale nakon popravke
+            complete: False ako je odgovor odsjecen (i nakon ponovljenog poziva)
+        """
+        print(f"[TaskDecomposer] Plan created with {len(plan_data.get('steps', []))} steps")
+        
+        # Kesiraju se samo kompletni planovi bez gresaka - inace bi svaki isti
+        # zahtjev dobijao neispravan plan iz kesa, bez novog LLM poziva
+        if not complete:
+            print("[TaskDecomposer] Plan is incomplete (truncated response), not cached")
+        elif unresolved:
+            print(f"[TaskDecomposer] Plan has {len(unresolved)} unresolved errors, not cached")
+        else:
+            plan_json = orjson.dumps(plan_data).decode()
+            self.cache.put(cache_key, plan_json)
+            if self.semantic_cache:
+                self.semantic_cache.put(semantic_text, plan_json)
+        
+        # Konvertuj u TaskPlan objekt
+        return self._create_task_plan(plan_data, parsed_input)
+    
+    def _cache_key(self, parsed_input: ParsedInput) -> str:
+        """Kljuc kesa - svi podaci koji uticu na prompt, plus model i verzija prompta"""
+        payload = orjson.dumps({
+            "intent": parsed_input.intent,
+            "application": parsed_input.application,
+            "lang": parsed_input.programming_language,
+            "actions": parsed_input.specific_actions,
+            "model": self.model,
+            # I kada TASK_DECOMPOSER_CACHE zada jednu bazu za sve verzije
+            "version": self._prompt_version
+        }, option=orjson.OPT_SORT_KEYS)
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _semantic_text(self, parsed_input: ParsedInput) -> str:
+        """Tekst po kojem se porede slicni zahtjevi"""
+        return f"{parsed_input.intent}|{parsed_input.application}|{parsed_input.programming_language or ''}"
+    
+    def _static_system_prompt(self) -> str:
+        """
+        Staticni dio prompta (pravila, primjer, akcije).
+        
+        Ne zavisi od zahtjeva, pa je prefiks svakog poziva isti i provider
+        ga moze kesirati. Kreira se jednom po instanci.
+        """
+        if self._sys_prompt is not None:
+            return self._sys_prompt
         
-        response_text = response_text.strip()
+        self._sys_prompt = _SYSTEM_PROMPT_TEMPLATE.format(action_types=self._action_types_str)
         
+        return self._sys_prompt
+    
+    def _dynamic_user_message(self, parsed_input: ParsedInput) -> str:
+        """Dio prompta koji zavisi od zahtjeva - ide na kraj poruka"""
+        return _USER_PROMPT_TEMPLATE.format(
+            intent=parsed_input.intent,
+            application=parsed_input.application,
+            language=parsed_input.programming_language or "Not specified",
+            actions_json=orjson.dumps(parsed_input.specific_actions).decode()
+        )
+
+    def _parse_response(self, response_text: str, streamed_steps: List[dict] = None) -> dict:
+        # JSON mode - odgovor je uvijek goli JSON objekat, bez markdowna
         try:
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
+            return orjson.loads(response_text)
+        except orjson.JSONDecodeError as e:
             print(f"[TaskDecomposer] JSON parse error: {e}")
             print(f"[TaskDecomposer] Response: {response_text[:500]}...")
+            
+            # Npr. odgovor odsjecen na max_tokens - koristi korake parsirane tokom streama
+            if streamed_steps:
+                print(f"[TaskDecomposer] Using {len(streamed_steps)} steps parsed from stream")
+                return {
+                    "goal": "",
+                    "prerequisites": [],
+                    "steps": streamed_steps,
+                    "success_criteria": ""
+                }
             raise
     
-    def _fix_plan(self, plan_data: dict, errors: list) -> dict:
+    def _fix_plan(self, plan_data: dict) -> Tuple[dict, List[str]]:
+        """
+        Lokalno popravi greske (nepoznata akcija, wait value, target).
+        
+        Returns:
+            (popravljen plan, greske koje su ostale nakon popravke)
+        """
+        # Ukloni korake koji nisu objekti
+        steps = plan_data.get("steps")
+        if isinstance(steps, list) and not all(isinstance(step, dict) for step in steps):
+            print("[FIX] Removing steps that are not objects")
+            plan_data["steps"] = [step for step in steps if isinstance(step, dict)]
+        
         for step in plan_data.get("steps", []):
             action = step.get("action", "")
             
@@ -435,50 +928,19 @@ class TaskDecomposer:
                 print(f"[FIX] Unknown action '{action}' -> 'click'")
                 step["action"] = "click"
             
-            # Dodaj value za wait ako nedostaje
-            if action == "wait" and not step.get("value"):
-                step["value"] = "4"
-            
-            # Ocisti value za wait (ukloni "sekundi", "seconds", itd.)
-            if action == "wait" and step.get("value"):
-                value = str(step["value"])
-                numbers = re.findall(r'\d+', value)
-                if numbers:
-                    step["value"] = numbers[0]
-                else:
-                    step["value"] = "4"
+            # Dodaj ili ocisti value za wait
+            if action == "wait":
+                step["value"] = _normalize_wait_value(step.get("value"))
             
             # Dodaj target ako nedostaje
             if not step.get("target"):
                 step["target"] = "screen"
         
-        return plan_data
+        _, unresolved, _ = self.validator.validate_plan(plan_data)
+        return plan_data, unresolved
     
     def _create_task_plan(self, plan_data: dict, parsed_input: ParsedInput) -> TaskPlan:
-        steps = []
-        for step_data in plan_data.get("steps", []):
-            try:
-                action = ActionType(step_data["action"])
-            except ValueError:
-                print(f"[TaskDecomposer] Unknown action: {step_data['action']}, using CLICK")
-                action = ActionType.CLICK
-            
-            value = step_data.get("value")
-            if value is not None:
-                value = str(value)
-                # Za wait, ocisti value
-                if action == ActionType.WAIT:
-                    numbers = re.findall(r'\d+', value)
-                    value = numbers[0] if numbers else "4"
-            
-            steps.append(Step(
-                id=step_data.get("id", len(steps) + 1),
-                action=action,
-                target=step_data.get("target", "screen"),
-                value=value,
-                description=step_data.get("description", ""),
-                expected_result=step_data.get("expected_result", "")
-            ))
+        steps = [_make_step(sd, i) for i, sd in enumerate(plan_data.get("steps", []), 1)]
         
         return TaskPlan(
             original_instruction=parsed_input.raw_input,
@@ -544,18 +1006,7 @@ class TaskDecomposer:
         print("-" * 70)
         
         for step in plan.steps:
-            action_label = {
-                ActionType.CLICK:  "[CLICK]",
-                ActionType.DOUBLE_CLICK: "[DBL-CLICK]",
-                ActionType.TYPE_TEXT:  "[TYPE]",
-                ActionType.KEY_PRESS: "[KEY]",
-                ActionType.KEY_COMBINATION: "[COMBO]",
-                ActionType.WAIT: "[WAIT]",
-                ActionType.OPEN_APPLICATION: "[OPEN]",
-                ActionType.SCROLL: "[SCROLL]",
-                ActionType.RIGHT_CLICK: "[R-CLICK]",
-                ActionType.MOVE_MOUSE: "[MOVE]"
-            }.get(step.action, "[ACTION]")
+            action_label = _ACTION_LABELS.get(step.action, "[ACTION]")
             
             print(f"\n  [{step.id:2d}] {action_label} {step. action. value. upper()}")
             print(f"Target: {step.target}")